@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+import functools
+import hashlib
+import hmac
 import os
+import random
+import sys
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, NamedTuple, Optional, Set, Tuple
 
-from flask import Flask, jsonify
+import orjson
+from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
 from dotenv import load_dotenv
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp, Request as GoogleAuthRequest
+import httplib2
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 
 # Load environment variables from a .env file if present. This allows local
@@ -19,6 +32,33 @@ load_dotenv(os.getenv("ROOM_KIOSK_ENV", "/opt/room-kiosk/.env"))
 
 app = Flask(__name__)
 
+# orjson encodes in C and produces bytes directly, which is noticeably
+# cheaper than the stdlib encoder on the Pi.  Keys are sorted so identical
+# payloads always serialise to identical bytes.
+ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Serialise `obj` to compact JSON bytes."""
+    return orjson.dumps(obj, option=ORJSON_OPTIONS)
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by `jsonify`."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_json(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_json(obj), mimetype="application/json")
+
+
+app.json = ORJSONProvider(app)
+
 # OAuth scope for read‑only calendar access. FreeBusy does not require full
 # Calendar API scope but read‑only scope is safe and sufficient.
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
@@ -51,13 +91,122 @@ ROOMS = [
 LOOKAHEAD_HOURS = int(os.environ.get("LOOKAHEAD_HOURS", "12"))
 CACHE_SECONDS = int(os.environ.get("CACHE_SECONDS", "15"))
 
-# Simple in‑memory cache.  Contains the timestamp of the last fetch and
-# the payload returned to callers.
-_cache: Dict[str, Any] = {"ts": 0.0, "payload": None}
+# The last good payload is also written to disk so that after a restart or
+# reboot the kiosk has something to show while the first refresh runs.
+CACHE_FILE = os.environ.get("ROOM_KIOSK_CACHE_FILE", "/var/cache/room-kiosk/status.json")
+
+# FreeBusy accepts a limited number of calendars per query, so larger room
+# lists are split into batches which are fetched concurrently.  The work is
+# almost entirely network latency, so a handful of threads is plenty.
+FREEBUSY_BATCH_SIZE = int(os.environ.get("FREEBUSY_BATCH_SIZE", "50"))
+FREEBUSY_WORKERS = int(os.environ.get("FREEBUSY_WORKERS", "8"))
+
+# FreeBusy is queried with a plain POST rather than through the discovery
+# client, which adds several layers of request building and response
+# parsing per call.  The partial response (`fields`) only asks Google for
+# the per‑calendar busy data, not the echoed request window and kind.
+FREEBUSY_URL = "https://www.googleapis.com/calendar/v3/freeBusy?fields=calendars"
+FREEBUSY_HEADERS = {"content-type": "application/json", "accept": "application/json"}
+
+# FreeBusy request `items`, pre‑split into batches.  ROOMS is fixed for the
+# life of the process so these are built once rather than on every refresh.
+_FREEBUSY_BATCHES = [
+    [{"id": r["calendar_id"]} for r in ROOMS[i : i + FREEBUSY_BATCH_SIZE]]
+    for i in range(0, len(ROOMS), FREEBUSY_BATCH_SIZE)
+]
+
+# Socket timeout (seconds) for calls to Google.
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("HTTP_TIMEOUT_SECONDS", "10"))
+
+# Retry policy for throttled or failed FreeBusy queries.  Delays use "full
+# jitter" (a random delay up to the exponential cap) so that several kiosks
+# throttled at the same moment don't all retry in lockstep.
+FREEBUSY_RETRIES = int(os.environ.get("FREEBUSY_RETRIES", "3"))
+RETRY_BACKOFF_SECONDS = float(os.environ.get("RETRY_BACKOFF_SECONDS", "0.2"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Upper bound (seconds) on how long a single refresh may spend talking to
+# Google, retries included.  Keeps /api/status responsive when Google is
+# throttling: once the budget is spent we stop retrying and fall back to
+# whatever data we already have.
+REFRESH_TIMEOUT_SECONDS = float(os.environ.get("REFRESH_TIMEOUT_SECONDS", "20"))
+
+# Optional push notifications.  When WEBHOOK_URL is set (a public HTTPS
+# address that reaches /api/calendar-webhook on this backend) each room
+# calendar is watched, and Google's change notifications trigger a refresh
+# straight away instead of at the next CACHE_SECONDS tick.  Notifications
+# must carry WEBHOOK_TOKEN to be accepted.
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL", "")
+WEBHOOK_TOKEN = os.environ["WEBHOOK_TOKEN"] if WEBHOOK_URL else ""
+# Active channels are saved here so a restart reuses them rather than
+# opening duplicates.  Google expires channels (after a week at most), so
+# they are renewed WATCH_RENEW_SECONDS ahead of time.
+WATCH_CHANNELS_FILE = os.environ.get(
+    "WATCH_CHANNELS_FILE", os.path.join(os.path.dirname(CACHE_FILE), "channels.json")
+)
+WATCH_RENEW_SECONDS = 3600
+# While every room calendar is watched, bookings made in between arrive as
+# notifications, so the only other reason the status changes is a booking
+# starting or ending.  Refreshes then happen at those boundaries, with a
+# full poll at least every WATCHED_REFRESH_SECONDS as a safety net.
+WATCHED_REFRESH_SECONDS = int(os.environ.get("WATCHED_REFRESH_SECONDS", "900"))
+
+
+class StatusSnapshot(NamedTuple):
+    """Immutable view of the cached room status."""
+
+    # Last good payload, and the JSON body served for it (so polls don't
+    # re-serialise an unchanged payload).  While `error` is set the body is
+    # instead the warning or error response describing it.
+    payload: Optional[Dict[str, Any]]
+    body: Optional[bytes]
+    # Weak validator for `body`; see `status_etag`.
+    etag: Optional[str]
+    # Time of the last successful fetch.
+    ts: float
+    # Error from the most recent refresh, None when it succeeded.
+    error: Optional[Exception]
+    # Epoch time of the earliest current_end / next_start in `payload`, the
+    # next moment a room's state changes without a new booking.
+    next_change: Optional[float]
+
+
+# Simple in‑memory cache, kept warm by a background thread that refreshes it
+# every CACHE_SECONDS.  Refreshes replace the whole snapshot in a single
+# assignment, so readers always see a payload, body and error that belong
+# together without taking a lock.  Request handlers only read from it,
+# except on a cold start when there is nothing to serve yet.
+_cache = StatusSnapshot(
+    payload=None, body=None, etag=None, ts=0.0, error=None, next_change=None
+)
+
+# Calls currently running under `single_flight`, keyed by name.
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+_refresher: Optional[threading.Thread] = None
+_refresher_lock = threading.Lock()
+# Set to make the refresher run now rather than at its next tick.
+_refresh_wakeup = threading.Event()
+
+# ETag of the payload last written to CACHE_FILE; used to skip rewriting the
+# file (and wearing the SD card) when nothing but the timestamps changed.
+_persisted_etag: Optional[str] = None
+# Paths whose last write failed.  Run outside the systemd unit the cache
+# directory is often not writable; that is logged once, not every refresh.
+_write_failed: Set[str] = set()
+
+
+# Python 3.11+ parses a trailing "Z" natively, which is several times faster
+# than rewriting the string first.
+_FROMISOFORMAT_HANDLES_Z = sys.version_info >= (3, 11)
 
 
 def iso_z(dt: datetime) -> str:
     """Return an RFC3339 timestamp in UTC with a Z suffix."""
+    if dt.tzinfo is timezone.utc:
+        # Already UTC (the common case): isoformat always ends in "+00:00".
+        return dt.isoformat()[:-6] + "Z"
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
     dt = dt.astimezone(timezone.utc)
@@ -67,86 +216,401 @@ def iso_z(dt: datetime) -> str:
 def parse_rfc3339(s: str) -> datetime:
     """Parse RFC3339 timestamps returned by Google into timezone‑aware datetimes."""
     if s.endswith("Z"):
-        s = s.replace("Z", "+00:00")
+        # Either way the result is already in timezone.utc (the singleton,
+        # which lets iso_z take its fast path), so skip astimezone.
+        if _FROMISOFORMAT_HANDLES_Z:
+            return datetime.fromisoformat(s)
+        return datetime.fromisoformat(s[:-1] + "+00:00")
     return datetime.fromisoformat(s).astimezone(timezone.utc)
 
 
+# One set of delegated credentials is shared by every service client.  The
+# key file is read once, and the access token is refreshed under a lock so
+# concurrent workers don't each mint a new token when it expires.
+_credentials: Optional[service_account.Credentials] = None
+_credentials_lock = threading.Lock()
+
+
+def get_credentials() -> service_account.Credentials:
+    """Return the shared delegated credentials with a valid access token."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            creds = service_account.Credentials.from_service_account_file(
+                CREDS_PATH,
+                scopes=SCOPES,
+            )
+            _credentials = creds.with_subject(DELEGATED_USER)
+        if not _credentials.valid:
+            _credentials.refresh(GoogleAuthRequest(httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)))
+        return _credentials
+
+
+# google-auth considers a token invalid once it is within 3m45s of expiry
+# (google.auth._helpers.REFRESH_THRESHOLD); renew ahead of that point.
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+
+def refresh_token_ahead(until: float) -> None:
+    """
+    Renew the access token now if it would expire before `until` (epoch seconds).
+
+    Called by the refresher between refreshes so that the next one doesn't
+    wait on an OAuth round trip first.  Only a token that is already in use
+    is renewed; loading or repairing credentials is left to get_credentials.
+    """
+    with _credentials_lock:
+        creds = _credentials
+        # Not `creds.valid`: that turns False a few minutes before expiry,
+        # which is exactly when the token should be renewed here.
+        if creds is None or creds.token is None or creds.expiry is None:
+            return
+        # google-auth keeps `expiry` as a naive UTC datetime.
+        expires = creds.expiry.replace(tzinfo=timezone.utc).timestamp()
+        if expires - TOKEN_REFRESH_MARGIN_SECONDS > until:
+            return
+        creds.refresh(GoogleAuthRequest(httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS)))
+
+
+def _new_authorized_http() -> AuthorizedHttp:
+    # httplib2 keeps connections alive per Http instance, so a long‑lived
+    # one reuses its TLS connection instead of handshaking on every call.
+    return AuthorizedHttp(get_credentials(), http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS))
+
+
+@functools.lru_cache(maxsize=1)
 def get_calendar_service():
-    """Create a Google Calendar API client using service account + delegation."""
-    creds = service_account.Credentials.from_service_account_file(
-        CREDS_PATH,
-        scopes=SCOPES,
+    """Return the process‑wide Google Calendar API client (service account + delegation)."""
+    # Built once: constructing a client parses the discovery document and
+    # generates every method binding.  Use the document bundled with
+    # google-api-python-client rather than downloading it.
+    return build(
+        "calendar", "v3", http=_new_authorized_http(), cache_discovery=False, static_discovery=True
     )
-    delegated = creds.with_subject(DELEGATED_USER)
-    return build("calendar", "v3", credentials=delegated, cache_discovery=False)
+
+
+# The service object can be shared, but httplib2 transports are not thread
+# safe, so every request is executed on the calling thread's own `http`.
+# The pool is created once and its threads live for the whole process, so
+# each one keeps its connection open between refreshes.
+_thread_local = threading.local()
+_executor = ThreadPoolExecutor(
+    # No point in more threads than there are batches to fetch.
+    max_workers=max(1, min(FREEBUSY_WORKERS, len(_FREEBUSY_BATCHES))),
+    thread_name_prefix="freebusy",
+)
+
+
+def _thread_http() -> AuthorizedHttp:
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = _thread_local.http = _new_authorized_http()
+    return http
+
+
+def execute(req) -> Dict[str, Any]:
+    """Execute a googleapiclient request over the current thread's connection."""
+    return req.execute(http=_thread_http())
+
+
+def _retry_after_seconds(exc: HttpError) -> float:
+    """Return the server's Retry-After hint in seconds, or 0 if absent/unparseable."""
+    value = exc.resp.get("retry-after") if exc.resp is not None else None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def freebusy_for_calendars(
+    items: List[Dict[str, str]],
+    time_min: str,
+    time_max: str,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Run a single FreeBusy query and return the `calendars` mapping.
+
+    `items` is the request's list of `{"id": calendar_id}` entries and the
+    window bounds are preformatted RFC3339 strings.  `deadline` is a
+    `time.monotonic()` value; no retry is attempted if its backoff delay
+    would run past it.
+    """
+    body = dumps_json({"timeMin": time_min, "timeMax": time_max, "items": items})
+    http = _thread_http()
+
+    attempt = 0
+    while True:
+        try:
+            # Refresh an expiring token here, under the lock, rather than
+            # letting each thread's AuthorizedHttp do it concurrently.
+            get_credentials()
+            resp, content = http.request(
+                FREEBUSY_URL, method="POST", body=body, headers=FREEBUSY_HEADERS
+            )
+            if resp.status >= 300:
+                # Same error type as the client library, so callers and the
+                # retry policy below don't care how the request was made.
+                raise HttpError(resp, content, uri=FREEBUSY_URL)
+            return orjson.loads(content).get("calendars", {})
+        except HttpError as exc:
+            attempt += 1
+            if exc.resp.status not in RETRY_STATUSES or attempt > FREEBUSY_RETRIES:
+                raise
+            delay = random.uniform(0, RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            delay = max(_retry_after_seconds(exc), delay)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise
+            app.logger.warning(
+                "FreeBusy returned %s, retrying in %.2fs (attempt %d/%d)",
+                exc.resp.status, delay, attempt, FREEBUSY_RETRIES,
+            )
+            time.sleep(delay)
+
+
+def fetch_busy(
+    time_min: datetime, time_max: datetime
+) -> Tuple[Dict[str, Any], List[Exception]]:
+    """
+    Query FreeBusy for every room calendar, one batch per thread.
+
+    Returns the merged `calendars` mapping plus any per-batch errors.  A
+    failing batch does not discard the results of the others.
+    """
+    # Formatted once and shared by every batch.
+    tmin = iso_z(time_min)
+    tmax = iso_z(time_max)
+
+    calendars: Dict[str, Any] = {}
+    errors: List[Exception] = []
+
+    deadline = time.monotonic() + REFRESH_TIMEOUT_SECONDS
+    futures = [
+        _executor.submit(freebusy_for_calendars, items, tmin, tmax, deadline)
+        for items in _FREEBUSY_BATCHES
+    ]
+    for future in futures:
+        try:
+            remaining = max(0.0, deadline - time.monotonic())
+            calendars.update(future.result(timeout=remaining))
+        except Exception as e:
+            # One line only: when every batch fails refresh_cache logs the
+            # full traceback, and a partial failure is reported in the
+            # payload's warning.
+            app.logger.warning("FreeBusy batch failed: %s: %s", type(e).__name__, e)
+            errors.append(e)
+
+    return calendars, errors
+
+
+# Push notification channels by calendar ID, each with its "id",
+# "resource_id", "expiration" (epoch seconds), the "address" and a
+# fingerprint of the "token" it was opened with, and whether Google's
+# "sync" ping has been "confirmed".  Only the refresher thread touches these.
+_channels: Optional[Dict[str, Dict[str, Any]]] = None
+# Epoch time before which a calendar whose watch failed is not retried.
+_watch_retry_at: Dict[str, float] = {}
+# IDs of channels whose notifications have reached the webhook.  Filled in
+# by request handlers and folded into `_channels` by the refresher.
+_channels_heard: Set[str] = set()
+
+# Identifies the WEBHOOK_TOKEN a channel was opened with, without saving
+# the secret itself next to the channels.
+_WEBHOOK_TOKEN_FINGERPRINT = hashlib.blake2b(WEBHOOK_TOKEN.encode(), digest_size=8).hexdigest()
+
+
+def _channel_current(channel: Dict[str, Any]) -> bool:
+    """True if `channel` still delivers to this WEBHOOK_URL with this WEBHOOK_TOKEN."""
+    return (
+        channel.get("address") == WEBHOOK_URL
+        and channel.get("token") == _WEBHOOK_TOKEN_FINGERPRINT
+    )
+
+
+def _valid_channel(channel: Any) -> bool:
+    return (
+        isinstance(channel, dict)
+        and isinstance(channel.get("id"), str)
+        and isinstance(channel.get("resource_id"), str)
+        and isinstance(channel.get("expiration"), (int, float))
+    )
+
+
+def _load_channels() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(WATCH_CHANNELS_FILE, "rb") as fh:
+            saved = orjson.loads(fh.read())
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        app.logger.exception("Ignoring unreadable channel file %s", WATCH_CHANNELS_FILE)
+        return {}
+
+    if not isinstance(saved, dict):
+        app.logger.warning("Ignoring malformed channel file %s", WATCH_CHANNELS_FILE)
+        return {}
+    # Malformed entries are dropped rather than trusted; their calendars
+    # are simply watched afresh.
+    channels = {cid: ch for cid, ch in saved.items() if _valid_channel(ch)}
+    if len(channels) != len(saved):
+        app.logger.warning(
+            "Ignoring %d malformed entries in %s", len(saved) - len(channels), WATCH_CHANNELS_FILE
+        )
+    return channels
+
+
+def _stop_channel(channel: Dict[str, Any]) -> None:
+    """Stop a superseded channel; failures only mean a few duplicate pings."""
+    try:
+        execute(
+            get_calendar_service().channels().stop(
+                body={"id": channel["id"], "resourceId": channel["resource_id"]}
+            )
+        )
+    except Exception:
+        app.logger.warning("Failed to stop notification channel %s", channel["id"])
+
+
+def ensure_calendar_watches() -> None:
+    """Create or renew push notification channels for every room calendar."""
+    global _channels
+    if _channels is None:
+        _channels = _load_channels()
+
+    now = time.time()
+    changed = False
+
+    for channel in _channels.values():
+        if not channel.get("confirmed") and channel["id"] in _channels_heard:
+            channel["confirmed"] = True
+            _channels_heard.discard(channel["id"])
+            changed = True
+
+    for r in ROOMS:
+        cid = r["calendar_id"]
+        old = _channels.get(cid)
+        if (
+            old is not None
+            and _channel_current(old)
+            and old["expiration"] - now > WATCH_RENEW_SECONDS
+        ):
+            continue
+        if _watch_retry_at.get(cid, 0.0) > now:
+            continue
+
+        body = {
+            "id": uuid.uuid4().hex,
+            "type": "web_hook",
+            "address": WEBHOOK_URL,
+            "token": WEBHOOK_TOKEN,
+        }
+        try:
+            get_credentials()
+            resp = execute(get_calendar_service().events().watch(calendarId=cid, body=body))
+        except Exception:
+            # Commonly a 403 when the delegated user can only see free/busy
+            # for this room.  Polling still covers it; try again later.
+            app.logger.exception("Failed to watch calendar %s for changes", cid)
+            _watch_retry_at[cid] = now + WATCH_RENEW_SECONDS
+            continue
+
+        if old is not None:
+            _stop_channel(old)
+        _channels[cid] = {
+            "id": resp["id"],
+            "resource_id": resp["resourceId"],
+            "expiration": int(resp["expiration"]) / 1000,
+            "address": WEBHOOK_URL,
+            "token": _WEBHOOK_TOKEN_FINGERPRINT,
+            # The "sync" ping may already have arrived during the watch call.
+            "confirmed": resp["id"] in _channels_heard,
+        }
+        changed = True
+
+    if changed:
+        write_file_atomic(WATCH_CHANNELS_FILE, dumps_json(_channels))
+
+
+def _utc_key(s: str) -> str:
+    """Return `s` as a "YYYY-MM-DDTHH:MM:SSZ" string, whose order is time order."""
+    if len(s) == 20 and s[19] == "Z":
+        # Google's usual form; nothing to do.
+        return s
+    dt = parse_rfc3339(s)
+    if dt.microsecond:
+        # Rounded up: against a whole-second `now`, t <= now exactly when
+        # ceil(t) <= now, so comparisons come out as they would unrounded.
+        dt = dt.replace(microsecond=0) + timedelta(seconds=1)
+    return iso_z(dt)
 
 
 def derive_state_from_busy(
-    busy: List[Dict[str, str]], now: datetime
+    busy: List[Dict[str, str]], now_s: str
 ) -> Tuple[str, Optional[str], Optional[str]]:
     """
     Determine room state using FreeBusy ranges only (privacy safe).
 
+    `now_s` is the current time, in whole seconds, as a
+    "YYYY-MM-DDTHH:MM:SSZ" string.
+
     Returns:
       - state: "occupied" or "free"
       - current_end: RFC3339 Z if occupied
       - next_start: RFC3339 Z if there is a future busy slot
     """
-    now_utc = now.astimezone(timezone.utc)
-
-    current_end: Optional[datetime] = None
-    next_start: Optional[datetime] = None
-
-    ranges = sorted(
-        [(parse_rfc3339(b["start"]), parse_rfc3339(b["end"])) for b in busy],
-        key=lambda x: x[0],
-    )
-
-    for start, end in ranges:
-        if start <= now_utc < end:
+    current_end: Optional[str] = None
+    next_start: Optional[str] = None
+
+    # Fixed-width UTC timestamps sort lexically in time order, so the
+    # ranges are compared as strings without parsing them into datetimes.
+    #
+    # One pass, no sort.  FreeBusy merges overlapping bookings, so at most
+    # one range contains `now` and every later range starts at or after its
+    # end: the earliest future start is the next booking either way.
+    for b in busy:
+        end = _utc_key(b["end"])
+        if end <= now_s:
+            # Already over; don't bother looking at its start.
+            continue
+        start = _utc_key(b["start"])
+        if start <= now_s:
             current_end = end
-            break
+        elif next_start is None or start < next_start:
+            next_start = start
 
     if current_end is None:
-        for start, _ in ranges:
-            if start > now_utc:
-                next_start = start
-                break
-        return "free", None, iso_z(next_start) if next_start else None
-
-    for start, _ in ranges:
-        if start >= current_end:
-            next_start = start
-            break
+        return "free", None, next_start
 
-    return "occupied", iso_z(current_end), iso_z(next_start) if next_start else None
+    return "occupied", current_end, next_start
 
 
 def fetch_status_payload() -> Dict[str, Any]:
     """Fetch FreeBusy data for all rooms and return a privacy‑safe status payload."""
-    service = get_calendar_service()
-
-    now = datetime.now(timezone.utc)
+    # Whole seconds, so now_s has the same fixed width as Google's
+    # timestamps and can be compared with them directly.
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    now_s = iso_z(now)
     time_min = now - timedelta(minutes=1)
     time_max = now + timedelta(hours=LOOKAHEAD_HOURS)
 
-    items = [{"id": r["calendar_id"]} for r in ROOMS]
-
-    body = {
-        "timeMin": iso_z(time_min),
-        "timeMax": iso_z(time_max),
-        "items": items,
-    }
+    calendars, errors = fetch_busy(time_min, time_max)
 
-    resp = service.freebusy().query(body=body).execute()
-    calendars = resp.get("calendars", {})
+    # Only give up when nothing came back; otherwise report the rooms we have.
+    if errors and not calendars:
+        raise errors[0]
 
     rooms_out: Dict[str, Any] = {}
 
     for r in ROOMS:
-        cal = calendars.get(r["calendar_id"], {})
+        cal = calendars.get(r["calendar_id"])
+        if cal is None:
+            if errors:
+                # Belongs to a failed batch; leave it out rather than
+                # reporting it as free.
+                continue
+            cal = {}
         busy = cal.get("busy", [])
-        state, current_end, next_start = derive_state_from_busy(busy, now)
+        state, current_end, next_start = derive_state_from_busy(busy, now_s)
 
         rooms_out[r["key"]] = {
             "label": r["name"],
@@ -154,52 +618,364 @@ def fetch_status_payload() -> Dict[str, Any]:
             "state": state,
             "current_end": current_end,
             "next_start": next_start,
-            "updated_at": iso_z(now),
+            "updated_at": now_s,
         }
 
-    return {"rooms": rooms_out, "updated_at": iso_z(now)}
+    payload: Dict[str, Any] = {
+        "rooms": rooms_out,
+        "updated_at": now_s,
+        # Lets the kiosk page poll at the rate the data actually changes.
+        "refresh_seconds": CACHE_SECONDS,
+    }
+    if errors:
+        payload["warning"] = (
+            f"Some rooms could not be fetched: {type(errors[0]).__name__}: {errors[0]}"
+        )
+    return payload
 
 
-@app.get("/api/status")
-def api_status():
-    """Return room states in JSON. Uses in‑memory caching for performance."""
-    now_ts = time.time()
+def status_etag(payload: Dict[str, Any]) -> str:
+    """
+    Return a weak ETag for `payload`, ignoring its `updated_at` timestamps.
+
+    Every refresh stamps a new `updated_at`, so hashing the raw body would
+    never match.  Two payloads differing only in those stamps describe the
+    same room states, which is exactly what a weak validator allows.
+    """
+    rooms = {
+        key: {k: v for k, v in room.items() if k != "updated_at"}
+        for key, room in payload["rooms"].items()
+    }
+    stable = {**payload, "rooms": rooms, "updated_at": None}
+    digest = hashlib.blake2b(dumps_json(stable), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
 
-    if _cache["payload"] is not None and (now_ts - _cache["ts"]) < CACHE_SECONDS:
-        return jsonify(_cache["payload"])
 
+def write_file_atomic(path: str, data: bytes) -> bool:
+    """Replace `path` with `data` via a temp file, logging and returning False on failure."""
+    tmp = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        if path not in _write_failed:
+            _write_failed.add(path)
+            app.logger.exception("Failed to write %s", path)
+        return False
+    _write_failed.discard(path)
+    return True
+
+
+def save_cached_status(body: bytes, etag: str) -> None:
+    """Atomically write the status body to CACHE_FILE if any room state changed."""
+    global _persisted_etag
+    if etag != _persisted_etag:
+        if write_file_atomic(CACHE_FILE, body):
+            _persisted_etag = etag
+        return
+    # Unchanged, so not rewritten; still bump the mtime, which
+    # load_cached_status takes as the time of the last fetch.
+    try:
+        os.utime(CACHE_FILE)
+    except OSError:
+        pass
+
+
+def next_state_change(payload: Dict[str, Any]) -> Optional[float]:
+    """Return the epoch time at which the first room in `payload` changes state."""
+    times = [
+        parse_rfc3339(r["current_end"] or r["next_start"]).timestamp()
+        for r in payload["rooms"].values()
+        if r["current_end"] or r["next_start"]
+    ]
+    return min(times, default=None)
+
+
+# Fields every room in a status payload carries.
+ROOM_FIELDS = {"label", "calendar_id", "state", "current_end", "next_start", "updated_at"}
+
+
+def check_status_payload(payload: Any) -> None:
+    """Raise ValueError unless `payload` is shaped like fetch_status_payload's output."""
+    rooms = payload.get("rooms") if isinstance(payload, dict) else None
+    if not isinstance(rooms, dict):
+        raise ValueError("status payload has no rooms")
+    for key, room in rooms.items():
+        if not isinstance(room, dict) or not ROOM_FIELDS <= room.keys():
+            raise ValueError(f"status payload room {key!r} is incomplete")
+        for field in ("current_end", "next_start"):
+            if room[field] is not None:
+                # Must be a timestamp next_state_change can parse.
+                parse_rfc3339(room[field])
+
+
+def load_cached_status() -> None:
+    """Seed the in‑memory cache from CACHE_FILE if it holds a recent payload."""
+    global _cache, _persisted_etag
+    try:
+        ts = os.path.getmtime(CACHE_FILE)
+        with open(CACHE_FILE, "rb") as fh:
+            body = fh.read()
+        payload = orjson.loads(body)
+        check_status_payload(payload)
+        etag = status_etag(payload)
+        next_change = next_state_change(payload)
+    except FileNotFoundError:
+        return
+    except Exception:
+        # A corrupt, unreadable or malformed file just means a cold start.
+        app.logger.exception("Ignoring unreadable status cache %s", CACHE_FILE)
+        return
+
+    # Beyond the lookahead window the saved next_start values are meaningless.
+    if time.time() - ts > LOOKAHEAD_HOURS * 3600:
+        return
+
+    _cache = StatusSnapshot(
+        payload=payload,
+        body=body,
+        etag=etag,
+        ts=ts,
+        error=None,
+        next_change=next_change,
+    )
+    _persisted_etag = etag
+
+
+def refresh_cache() -> None:
+    """Fetch a fresh payload into the cache, recording the error on failure."""
+    global _cache
     try:
         payload = fetch_status_payload()
-        _cache["payload"] = payload
-        _cache["ts"] = now_ts
-        return jsonify(payload)
     except Exception as e:
         # Log full error details to journald for debugging
         app.logger.exception("Failed to fetch room status from Google Calendar FreeBusy")
+        payload = _cache.payload
+        if payload is not None:
+            # Keep last known good payload if we have one
+            body = dumps_json(
+                {
+                    **payload,
+                    "warning": f"Using cached data due to backend error: {type(e).__name__}: {e}",
+                }
+            )
+        else:
+            # Otherwise return an error with message for troubleshooting (local only)
+            body = dumps_json(
+                {
+                    "error": "Backend failed to fetch room status",
+                    "detail": type(e).__name__,
+                    "message": str(e),
+                }
+            )
+        _cache = _cache._replace(body=body, error=e)
+    else:
+        body = dumps_json(payload)
+        etag = status_etag(payload)
+        _cache = StatusSnapshot(
+            payload=payload,
+            body=body,
+            etag=etag,
+            ts=time.time(),
+            error=None,
+            next_change=next_state_change(payload),
+        )
+        save_cached_status(body, etag)
+
+
+def single_flight(key: str, fn: Callable[[], None]) -> None:
+    """
+    Run `fn` unless a call with the same key is already running.
+
+    If one is, wait for it to finish instead of starting another, so at most
+    one refresh per key talks to Google at any time.
+    """
+    with _inflight_lock:
+        event = _inflight.get(key)
+        leader = event is None
+        if leader:
+            event = _inflight[key] = threading.Event()
+
+    if not leader:
+        event.wait()
+        return
+
+    try:
+        fn()
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        event.set()
+
+
+def _refresh_if_cold() -> None:
+    # Re-checked after winning the single flight: the refresher may have
+    # filled the cache between the caller's check and now.
+    if _cache.payload is None and _cache.error is None:
+        refresh_cache()
+
+
+def _all_rooms_watched() -> bool:
+    """True while every room calendar has a live notification channel."""
+    channels = _channels
+    if not WEBHOOK_URL or channels is None:
+        return False
+    now = time.time()
+    for r in ROOMS:
+        channel = channels.get(r["calendar_id"])
+        if (
+            channel is None
+            or channel["expiration"] <= now
+            or not _channel_current(channel)
+            # Only once Google has shown it can reach the webhook.
+            or not (channel.get("confirmed") or channel["id"] in _channels_heard)
+        ):
+            return False
+    return True
+
+
+def refresh_due_at(snapshot: StatusSnapshot) -> float:
+    """Return the epoch time by which `snapshot` should be refreshed."""
+    # A failed refresh is retried at the normal rate: its next_change may
+    # already have passed unseen.  So is a partial one ("warning" set), whose
+    # payload is missing the rooms that failed.
+    if (
+        snapshot.error is not None
+        or (snapshot.payload is not None and "warning" in snapshot.payload)
+        or not _all_rooms_watched()
+    ):
+        return snapshot.ts + CACHE_SECONDS
+    due = snapshot.ts + WATCHED_REFRESH_SECONDS
+    # Wake just after the boundary so fetch_status_payload sees the new
+    # state.  A boundary that passed while the refresh was running makes the
+    # next one due straight away; that can't spin, as a successful payload's
+    # next_change always lies after its own fetch time.
+    if snapshot.next_change is not None and snapshot.next_change < due:
+        due = snapshot.next_change + 1
+    return due
+
+
+def _refresh_loop() -> None:
+    # Refreshes start every CACHE_SECONDS regardless of how long each fetch
+    # takes, so the cached payload is never older than the max-age it is
+    # served with.  With every calendar watched they wait for the next state
+    # change instead (see WATCHED_REFRESH_SECONDS); notifications set
+    # _refresh_wakeup to refresh early.  An access token that would expire
+    # before the next refresh is renewed while idle.
+    while True:
+        started = time.time()
+        single_flight("status", refresh_cache)
+        if WEBHOOK_URL:
+            ensure_calendar_watches()
+        due = refresh_due_at(_cache._replace(ts=started))
+        try:
+            # Valid for the whole of the next refresh, retries included.
+            refresh_token_ahead(due + REFRESH_TIMEOUT_SECONDS)
+        except Exception:
+            # The next refresh will try again (and report it) if need be.
+            app.logger.exception("Failed to renew the Google access token")
+        _refresh_wakeup.wait(max(0.0, due - time.time()))
+        _refresh_wakeup.clear()
+
+
+def start_background_refresh() -> None:
+    """Start the cache refresher thread if it isn't already running."""
+    global _refresher
+    # Checked without the lock first: this runs on every /api/status, and
+    # the thread is nearly always already running.
+    refresher = _refresher
+    if refresher is not None and refresher.is_alive():
+        return
+    with _refresher_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = threading.Thread(
+                target=_refresh_loop, name="status-refresh", daemon=True
+            )
+            _refresher.start()
+
+
+load_cached_status()
+# Started at import so the cache is warm before the first poll under
+# gunicorn too, which never runs __main__.  (With --preload the thread would
+# not survive the fork; api_status restarts it in the worker.)
+start_background_refresh()
+
+# Headers for responses that must never be served from a cache: errors,
+# stale fallbacks and health checks should always reach the backend.
+NO_STORE = {"Cache-Control": "no-store"}
+
+
+@app.get("/api/status")
+def api_status():
+    """Return room states in JSON straight from the background‑refreshed cache."""
+    # Also started here in case the thread was lost, e.g. to a fork.
+    start_background_refresh()
+    if _cache.payload is None and _cache.error is None:
+        # Cold start: join the refresher's in‑flight fetch (or run one).
+        # Once an attempt has failed, serve its cached error instead and
+        # leave retrying to the refresher.
+        single_flight("status", _refresh_if_cold)
+
+    snapshot = _cache
+
+    if snapshot.error is None:
+        # Kiosks revalidate with If-None-Match; while the room states are
+        # unchanged they get an empty 304 instead of the full body.
+        resp = app.response_class(snapshot.body, mimetype="application/json")
+        resp.headers["ETag"] = snapshot.etag
+        # Fresh until the next background refresh is due, which lets nginx
+        # (see nginx/room-kiosk.conf) answer polls without calling Flask.
+        # Never beyond CACHE_SECONDS, so refreshes triggered by notifications
+        # still reach the kiosks promptly.
+        remaining = min(refresh_due_at(snapshot) - time.time(), CACHE_SECONDS)
+        # Written out by hand: Werkzeug only knows stale-while-revalidate
+        # from 3.1 and silently drops it before then.
+        resp.headers["Cache-Control"] = (
+            f"public, max-age={max(0, int(remaining))}, "
+            f"stale-while-revalidate={CACHE_SECONDS}"
+        )
+        return resp.make_conditional(request)
+
+    # The last refresh failed: the body is the stale payload with a warning,
+    # or an error if there has never been a good one.
+    return app.response_class(
+        snapshot.body,
+        status=200 if snapshot.payload is not None else 500,
+        mimetype="application/json",
+        headers=NO_STORE,
+    )
+
+
+@app.post("/api/calendar-webhook")
+def api_calendar_webhook():
+    """Receive Google Calendar change notifications and refresh straight away."""
+    token = request.headers.get("X-Goog-Channel-Token", "")
+    # Compared as bytes: compare_digest rejects non-ASCII str arguments.
+    if not WEBHOOK_URL or not hmac.compare_digest(token.encode(), WEBHOOK_TOKEN.encode()):
+        return "", 403
 
-        # Keep last known good payload if we have one
-        if _cache["payload"] is not None:
-            cached = dict(_cache["payload"])
-            cached["warning"] = f"Using cached data due to backend error: {type(e).__name__}: {e}"
-            return jsonify(cached), 200
+    # Any notification shows that the channel reaches us.
+    channel_id = request.headers.get("X-Goog-Channel-ID")
+    if channel_id:
+        _channels_heard.add(channel_id)
 
-        # Otherwise return an error with message for troubleshooting (local only)
-        return jsonify(
-            {
-                "error": "Backend failed to fetch room status",
-                "detail": type(e).__name__,
-                "message": str(e),
-            }
-        ), 500
+    # "sync" is sent once when a channel is created and reports no change.
+    if request.headers.get("X-Goog-Resource-State") != "sync":
+        start_background_refresh()
+        _refresh_wakeup.set()
+    return "", 204
 
 
 @app.get("/api/health")
 def api_health():
     """Simple health check endpoint."""
-    return jsonify({"ok": True})
+    return jsonify({"ok": True}), 200, NO_STORE
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "5000"))
     # Bind only to localhost by default. Use a reverse proxy to expose externally.
+    # For local testing; the systemd unit serves the app with gunicorn.
     app.run(host="127.0.0.1", port=port)
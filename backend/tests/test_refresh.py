@@ -0,0 +1,84 @@
+"""Checks for when the background refresher schedules its next refresh."""
+
+import logging
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("DELEGATED_USER", "kiosk@example.com")
+os.environ.setdefault("ROOM_04_CALENDAR_ID", "room04@example.com")
+os.environ.setdefault("ROOM_05_CALENDAR_ID", "room05@example.com")
+os.environ.setdefault("ROOM_KIOSK_ENV", os.devnull)
+os.environ.setdefault("ROOM_KIOSK_CACHE_FILE", os.path.join(os.devnull, "status.json"))
+os.environ.setdefault("GOOGLE_APPLICATION_CREDENTIALS", os.devnull)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing starts the refresher, which fails without real credentials.
+logging.disable(logging.CRITICAL)
+import app  # noqa: E402
+
+
+class RefreshDueAtTests(unittest.TestCase):
+    """refresh_due_at while every room calendar is watched."""
+
+    def setUp(self):
+        now = time.time()
+        channels = {
+            r["calendar_id"]: {
+                "id": r["key"],
+                "resource_id": r["key"],
+                "expiration": now + 86400,
+                "address": "https://kiosk.example.com/api/calendar-webhook",
+                "token": app._WEBHOOK_TOKEN_FINGERPRINT,
+                "confirmed": True,
+            }
+            for r in app.ROOMS
+        }
+        for name, value in (
+            ("WEBHOOK_URL", "https://kiosk.example.com/api/calendar-webhook"),
+            ("_channels", channels),
+        ):
+            patcher = mock.patch.object(app, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def snapshot(self, **fields):
+        values = dict(
+            payload={"rooms": {}},
+            body=b"{}",
+            etag='W/"x"',
+            ts=time.time(),
+            error=None,
+            next_change=None,
+        )
+        values.update(fields)
+        return app.StatusSnapshot(**values)
+
+    def test_no_boundary_waits_for_watched_interval(self):
+        snapshot = self.snapshot()
+        self.assertEqual(app.refresh_due_at(snapshot), snapshot.ts + app.WATCHED_REFRESH_SECONDS)
+
+    def test_upcoming_boundary(self):
+        snapshot = self.snapshot(next_change=time.time() + 60)
+        self.assertEqual(app.refresh_due_at(snapshot), snapshot.next_change + 1)
+
+    def test_boundary_passed_during_refresh_is_due_now(self):
+        snapshot = self.snapshot(next_change=time.time() - 0.78)
+        self.assertLessEqual(app.refresh_due_at(snapshot), time.time() + 1)
+
+    def test_failed_refresh_uses_cache_seconds(self):
+        snapshot = self.snapshot(error=RuntimeError("down"))
+        self.assertEqual(app.refresh_due_at(snapshot), snapshot.ts + app.CACHE_SECONDS)
+
+    def test_partial_refresh_uses_cache_seconds(self):
+        snapshot = self.snapshot(
+            payload={"rooms": {}, "warning": "Some rooms could not be fetched"}
+        )
+        self.assertEqual(app.refresh_due_at(snapshot), snapshot.ts + app.CACHE_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()